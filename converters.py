@@ -1,14 +1,99 @@
 
 from __future__ import annotations
+import io
 import re
-import xml.etree.ElementTree as ET
+import sys
+try:
+    # lxml (libxml2) parses much faster than the stdlib; fall back if missing
+    import lxml.etree as ET  # type: ignore[import-untyped]
+    HAVE_LXML = True
+except ImportError:  # pragma: no cover
+    import xml.etree.ElementTree as ET
+    HAVE_LXML = False
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import Callable, Iterator, List, Dict, Optional, TextIO, Tuple
 
 # Namespace used by Microsoft Word bibliography files
-NS = {"b": "http://schemas.openxmlformats.org/officeDocument/2006/bibliography"}
+_NS_URI = "http://schemas.openxmlformats.org/officeDocument/2006/bibliography"
 
-@dataclass
+# Fully qualified (Clark notation) tags, so lookups skip prefix resolution
+B_SOURCE = f"{{{_NS_URI}}}Source"
+B_TAG = f"{{{_NS_URI}}}Tag"
+B_SOURCETYPE = f"{{{_NS_URI}}}SourceType"
+B_TITLE = f"{{{_NS_URI}}}Title"
+B_YEAR = f"{{{_NS_URI}}}Year"
+B_JOURNALNAME = f"{{{_NS_URI}}}JournalName"
+B_BOOKTITLE = f"{{{_NS_URI}}}BookTitle"
+B_PUBLISHER = f"{{{_NS_URI}}}Publisher"
+B_CITY = f"{{{_NS_URI}}}City"
+B_VOLUME = f"{{{_NS_URI}}}Volume"
+B_NUMBER = f"{{{_NS_URI}}}Number"
+B_PAGES = f"{{{_NS_URI}}}Pages"
+B_DOI = f"{{{_NS_URI}}}DOI"
+B_URL = f"{{{_NS_URI}}}URL"
+B_LCID = f"{{{_NS_URI}}}LCID"
+B_AUTHOR = f"{{{_NS_URI}}}Author"
+B_EDITOR = f"{{{_NS_URI}}}Editor"
+B_NAMELIST = f"{{{_NS_URI}}}NameList"
+B_PERSON = f"{{{_NS_URI}}}Person"
+B_CORPORATE = f"{{{_NS_URI}}}Corporate"
+B_FIRST = f"{{{_NS_URI}}}First"
+B_MIDDLE = f"{{{_NS_URI}}}Middle"
+B_LAST = f"{{{_NS_URI}}}Last"
+B_SUFFIX = f"{{{_NS_URI}}}Suffix"
+
+_YEAR_RE = re.compile(r"\d{4}")
+_NONWORD_RE = re.compile(r"\W+")
+
+# Source child tag -> Source field, for a single pass over the children
+_FIELD_DISPATCH = {
+    B_TAG: "tag",
+    B_SOURCETYPE: "type",
+    B_TITLE: "title",
+    B_YEAR: "year",
+    B_JOURNALNAME: "journal",
+    B_BOOKTITLE: "book_title",
+    B_PUBLISHER: "publisher",
+    B_CITY: "city",
+    B_VOLUME: "volume",
+    B_NUMBER: "issue",
+    B_PAGES: "pages",
+    B_DOI: "doi",
+    B_URL: "url",
+}
+
+# Word SourceType (lowercased) -> BibTeX entry type / RIS reference type
+_BIBTEX_TYPES = {
+    "journalarticle": "article",
+    "book": "book",
+    "booksection": "incollection",
+    "conferenceproceedings": "inproceedings",
+    "report": "techreport",
+    "thesis": "phdthesis",
+    "mastersthesis": "mastersthesis",
+    "internet": "misc",
+    "webpage": "misc",
+    "film": "misc",
+    "art": "misc",
+    "patent": "misc",
+}
+
+_RIS_TYPES = {
+    "journalarticle": "JOUR",
+    "book": "BOOK",
+    "booksection": "CHAP",
+    "conferenceproceedings": "CPAPER",
+    "report": "RPRT",
+    "thesis": "THES",
+    "mastersthesis": "THES",
+    "internet": "ELEC",
+    "webpage": "ELEC",
+    "film": "MPCT",
+    "art": "GEN",
+    "patent": "PAT",
+}
+
+@dataclass(slots=True)
 class Person:
     first: str = ""
     middle: str = ""
@@ -30,7 +115,7 @@ class Person:
             given = (given + (" " if given else "") + self.suffix).strip()
         return f"{self.last}, {given}".strip(", ")
 
-@dataclass
+@dataclass(slots=True)
 class Source:
     tag: str = ""
     type: str = ""
@@ -51,187 +136,223 @@ class Source:
     def bibtex_key(self) -> str:
         # lastnameYYYYFirstWord
         last = self.authors[0].last if self.authors else "anon"
-        year = re.findall(r"\d{4}", self.year or "")
-        y = year[0] if year else "n.d."
-        fw = re.sub(r"\W+", "", (self.title or "untitled").split()[0])[:12]
+        year = _YEAR_RE.search(self.year or "")
+        y = year.group() if year else "n.d."
+        fw = _NONWORD_RE.sub("", (self.title or "untitled").split()[0])[:12]
         return f"{last}{y}{fw}".lower()
 
     def entry_type_bibtex(self) -> str:
-        t = (self.type or "").lower()
-        mapping = {
-            "journalarticle": "article",
-            "book": "book",
-            "booksection": "incollection",
-            "conferenceproceedings": "inproceedings",
-            "report": "techreport",
-            "thesis": "phdthesis",
-            "mastersthesis": "mastersthesis",
-            "internet": "misc",
-            "webpage": "misc",
-            "film": "misc",
-            "art": "misc",
-            "patent": "misc",
-        }
-        return mapping.get(t, "misc")
+        return _BIBTEX_TYPES.get((self.type or "").lower(), "misc")
 
     def entry_type_ris(self) -> str:
-        t = (self.type or "").lower()
-        mapping = {
-            "journalarticle": "JOUR",
-            "book": "BOOK",
-            "booksection": "CHAP",
-            "conferenceproceedings": "CPAPER",
-            "report": "RPRT",
-            "thesis": "THES",
-            "mastersthesis": "THES",
-            "internet": "ELEC",
-            "webpage": "ELEC",
-            "film": "MPCT",
-            "art": "GEN",
-            "patent": "PAT",
-        }
-        return mapping.get(t, "GEN")
+        return _RIS_TYPES.get((self.type or "").lower(), "GEN")
 
 def _text(node: Optional[ET.Element]) -> str:
     return (node.text or "").strip() if node is not None else ""
 
-def _find(node: ET.Element, path: str) -> Optional[ET.Element]:
-    return node.find(path, NS)
+def _iter_source_elements(xml_bytes: bytes) -> Iterator[ET.Element]:
+    """Stream b:Source elements, dropping each one from the tree once the
+    caller is done with it, so memory does not grow with the file."""
+    stream = io.BytesIO(xml_bytes)
+    if HAVE_LXML:
+        # uploads are untrusted: expand internal DTD entities like the stdlib
+        # parser does, but never external ones (they could read local files)
+        events = ET.iterparse(
+            stream, events=("end",), tag=B_SOURCE,
+            resolve_entities="internal", no_network=True,
+        )
+        for _, elem in events:
+            yield elem
+            elem.clear()
+            # drop already processed siblings so the root does not keep them alive
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        return
+
+    # The stdlib elements have no parent pointers; track the open elements
+    # so a finished Source can be detached from its parent.
+    open_elems: List[ET.Element] = []
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            open_elems.append(elem)
+            continue
+        open_elems.pop()
+        if elem.tag != B_SOURCE:
+            continue
+        yield elem
+        elem.clear()
+        if open_elems:
+            open_elems[-1].remove(elem)
+
+def _parse_person(person: ET.Element) -> Person:
+    return Person(
+        first=_text(person.find(B_FIRST)),
+        middle=_text(person.find(B_MIDDLE)),
+        last=_text(person.find(B_LAST)),
+        suffix=_text(person.find(B_SUFFIX)),
+    )
+
+def _read_people(role: Optional[ET.Element], people: List[Person], corporate: bool = False) -> None:
+    """Append the people listed under a contributor role element to `people`.
+
+    Word groups the roles in the Source's b:Author container, e.g.
+    <Author><Author><NameList><Person> for authors and
+    <Author><Editor><NameList><Person> for editors. A corporate author sits
+    next to the NameList and is appended after the persons.
+    """
+    if role is None:
+        return
+    for name_list in role.iterfind(B_NAMELIST):
+        for person in name_list.iterfind(B_PERSON):
+            people.append(_parse_person(person))
+    if corporate:
+        corp = role.find(B_CORPORATE)
+        if corp is not None:
+            people.append(Person(last=_text(corp)))
 
 def parse_sources_xml(xml_bytes: bytes) -> List[Source]:
     """Parse Microsoft Word Sources.xml to a list of Source objects."""
-    tree = ET.fromstring(xml_bytes)
-    if tree.tag.endswith("Sources"):
-        root = tree
-    else:
-        # maybe the file had a BOM or wrapper; try to find matching node
-        root = tree.find(".//b:Sources", NS) or tree
-
     sources = []
-    for s in root.findall("b:Source", NS):
-        src = Source()
-        src.tag = _text(_find(s, "b:Tag"))
-        src.type = _text(_find(s, "b:SourceType"))
-        src.title = _text(_find(s, "b:Title"))
-        src.year = _text(_find(s, "b:Year"))
-        src.journal = _text(_find(s, "b:JournalName"))
-        src.book_title = _text(_find(s, "b:BookTitle"))
-        src.publisher = _text(_find(s, "b:Publisher"))
-        src.city = _text(_find(s, "b:City"))
-        src.volume = _text(_find(s, "b:Volume"))
-        src.issue = _text(_find(s, "b:Number"))
-        src.pages = _text(_find(s, "b:Pages"))
-        src.doi = _text(_find(s, "b:DOI"))
-        src.url = _text(_find(s, "b:URL")) or _text(_find(s, "b:LCID"))  # LCID misused sometimes
-
-        # Authors
-        for person in s.findall(".//b:Author/b:Author/b:NameList/b:Person", NS):
-            p = Person(
-                first=_text(_find(person, "b:First")),
-                middle=_text(_find(person, "b:Middle")),
-                last=_text(_find(person, "b:Last")),
-                suffix=_text(_find(person, "b:Suffix")),
-            )
-            src.authors.append(p)
-        # Corporate author
-        for corp in s.findall(".//b:Author/b:Author/b:Corporate", NS):
-            src.authors.append(Person(last=_text(corp)))
-
-        # Editors (rare but present)
-        for person in s.findall(".//b:Editor/b:Editor/b:NameList/b:Person", NS):
-            p = Person(
-                first=_text(_find(person, "b:First")),
-                middle=_text(_find(person, "b:Middle")),
-                last=_text(_find(person, "b:Last")),
-                suffix=_text(_find(person, "b:Suffix")),
-            )
-            src.editors.append(p)
-
-        sources.append(src)
+    for s in _iter_source_elements(xml_bytes):
+        fields: Dict[str, str] = {}
+        authors: List[Person] = []
+        editors: List[Person] = []
+        lcid = ""
+        for child in s:
+            tag = child.tag
+            if tag == B_AUTHOR:
+                _read_people(child.find(B_AUTHOR), authors, corporate=True)
+                # Editors (rare but present) share the contributors container
+                _read_people(child.find(B_EDITOR), editors)
+            elif tag == B_EDITOR:
+                # Source/Editor/Editor layout, matched by the old lookup too
+                _read_people(child.find(B_EDITOR), editors)
+            elif tag == B_LCID:
+                if not lcid:
+                    lcid = _text(child)
+            else:
+                attr = _FIELD_DISPATCH.get(tag)
+                if attr:
+                    # first occurrence wins, like find() did
+                    fields.setdefault(attr, _text(child))
+        if "type" in fields:
+            # a handful of distinct types repeat across all Sources; share them
+            fields["type"] = sys.intern(fields["type"])
+        if lcid and not fields.get("url"):
+            fields["url"] = lcid  # LCID misused sometimes
+        sources.append(Source(authors=authors, editors=editors, **fields))
     return sources
 
+# Minimal escaping for BibTeX, applied in a single translate() pass
+_BIBTEX_TABLE = str.maketrans({"\\": "\\\\", "{": "\\{", "}": "\\}", '"': '\\"'})
+
 def _escape_bibtex(value: str) -> str:
-    # Minimal escaping for BibTeX
-    value = value.replace("\\", "\\\\")
-    for ch in ["{", "}", "\""]:
-        value = value.replace(ch, f"\\{ch}")
-    return value
+    return value.translate(_BIBTEX_TABLE)
+
+def _write_bibtex(sources: List[Source], buf: TextIO) -> None:
+    write = buf.write
+    for i, s in enumerate(sources):
+        if i:
+            write("\n")
+        write(f"@{s.entry_type_bibtex()}{{{s.bibtex_key()},\n")
+        authors = " and ".join([a.format_bibtex() for a in s.authors]) if s.authors else ""
+        editors = " and ".join([e.format_bibtex() for e in s.editors]) if s.editors else ""
+        sep = ""
+        for k, v in (
+            ("title", s.title),
+            ("year", s.year),
+            ("journal", s.journal),
+            ("booktitle", s.book_title),
+            ("publisher", s.publisher),
+            ("address", s.city),
+            ("volume", s.volume),
+            ("number", s.issue),
+            ("pages", s.pages),
+            ("doi", s.doi),
+            ("url", s.url),
+            ("author", authors),
+            ("editor", editors),
+        ):
+            if v:
+                write(f"{sep}  {k} = {{{_escape_bibtex(v)}}}")
+                sep = ",\n"
+        write("\n}\n")
+
+def _split_pages(pages: str) -> Tuple[str, str]:
+    """Split "101-110" into start and end page; ("12", "") when there is no range."""
+    i = pages.find("-")
+    if i < 0:
+        return pages, ""
+    return pages[:i], pages[i + 1:]
+
+def _write_ris(sources: List[Source], buf: TextIO) -> None:
+    write = buf.write
+    for i, s in enumerate(sources):
+        if i:
+            write("\n")
+        write(f"TY  - {s.entry_type_ris()}\n")
+        for a in s.authors:
+            name = a.format_ris()
+            if name: write(f"AU  - {name}\n")
+        for e in s.editors:
+            name = e.format_ris()
+            if name: write(f"ED  - {name}\n")
+        if s.title: write(f"TI  - {s.title}\n")
+        if s.year: write(f"PY  - {s.year}\n")
+        if s.journal: write(f"JO  - {s.journal}\n")
+        if s.book_title: write(f"T2  - {s.book_title}\n")
+        if s.volume: write(f"VL  - {s.volume}\n")
+        if s.issue: write(f"IS  - {s.issue}\n")
+        sp, ep = _split_pages(s.pages or "")
+        if sp: write(f"SP  - {sp}\n")
+        if ep: write(f"EP  - {ep}\n")
+        if s.doi: write(f"DO  - {s.doi}\n")
+        if s.url: write(f"UR  - {s.url}\n")
+        if s.publisher: write(f"PB  - {s.publisher}\n")
+        if s.city: write(f"CY  - {s.city}\n")
+        write("ER  - \n")
+
+def _to_bytes(write: Callable[[List[Source], TextIO], None], sources: List[Source]) -> bytes:
+    # Encode while writing, so the output never exists as a str and bytes at once
+    raw = io.BytesIO()
+    buf = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    write(sources, buf)
+    buf.detach()
+    return raw.getvalue()
 
 def to_bibtex(sources: List[Source]) -> str:
-    entries = []
-    for s in sources:
-        entry_type = s.entry_type_bibtex()
-        key = s.bibtex_key()
-        fields: Dict[str, str] = {}
+    buf = io.StringIO()
+    _write_bibtex(sources, buf)
+    return buf.getvalue()
 
-        if s.title: fields["title"] = s.title
-        if s.year: fields["year"] = s.year
-        if s.journal: fields["journal"] = s.journal
-        if s.book_title: fields["booktitle"] = s.book_title
-        if s.publisher: fields["publisher"] = s.publisher
-        if s.city: fields["address"] = s.city
-        if s.volume: fields["volume"] = s.volume
-        if s.issue: fields["number"] = s.issue
-        if s.pages: fields["pages"] = s.pages
-        if s.doi: fields["doi"] = s.doi
-        if s.url: fields["url"] = s.url
-
-        if s.authors:
-            fields["author"] = " and ".join([a.format_bibtex() for a in s.authors])
-        if s.editors:
-            fields["editor"] = " and ".join([e.format_bibtex() for e in s.editors])
-
-        # Build entry
-        body = ",\n".join([f"  {k} = {{{_escape_bibtex(v)}}}" for k, v in fields.items() if v])
-        entries.append(f"@{entry_type}{{{key},\n{body}\n}}")
-    return "\n\n".join(entries).strip() + ("\n" if entries else "")
+def to_bibtex_bytes(sources: List[Source]) -> bytes:
+    """Same as to_bibtex, UTF-8 encoded (e.g. for a download)."""
+    return _to_bytes(_write_bibtex, sources)
 
 def to_ris(sources: List[Source]) -> str:
-    lines: List[str] = []
-    def add(tag: str, val: Optional[str]):
-        if val:
-            lines.append(f"{tag}  - {val}")
-    for s in sources:
-        add("TY", s.entry_type_ris())
-        if s.authors:
-            for a in s.authors:
-                add("AU", a.format_ris())
-        if s.editors:
-            for e in s.editors:
-                add("ED", e.format_ris())
-        add("TI", s.title)
-        add("PY", s.year)
-        add("JO", s.journal)
-        add("T2", s.book_title)
-        add("VL", s.volume)
-        add("IS", s.issue)
-        add("SP", s.pages.split("-")[0] if "-" in (s.pages or "") else s.pages)
-        add("EP", s.pages.split("-")[1] if "-" in (s.pages or "") else None)
-        add("DO", s.doi)
-        add("UR", s.url)
-        add("PB", s.publisher)
-        add("CY", s.city)
-        lines.append("ER  - ")
-        lines.append("")
-    return "\n".join(lines).strip() + ("\n" if lines else "")
-
-def to_rows(sources: List[Source]):
-    rows = []
-    for s in sources:
-        rows.append({
-            "key": s.bibtex_key(),
-            "type": s.type,
-            "title": s.title,
-            "year": s.year,
-            "journal": s.journal,
-            "book_title": s.book_title,
-            "publisher": s.publisher,
-            "city": s.city,
-            "volume": s.volume,
-            "issue": s.issue,
-            "pages": s.pages,
-            "doi": s.doi,
-            "url": s.url,
-            "authors": "; ".join([a.format_ris() for a in s.authors]),
-        })
-    return rows
+    buf = io.StringIO()
+    _write_ris(sources, buf)
+    return buf.getvalue()
+
+def to_ris_bytes(sources: List[Source]) -> bytes:
+    """Same as to_ris, UTF-8 encoded (e.g. for a download)."""
+    return _to_bytes(_write_ris, sources)
+
+def to_columns(sources: List[Source]) -> Dict[str, List[str]]:
+    """Table data as one list per column, ready for pd.DataFrame."""
+    return {
+        "key": [s.bibtex_key() for s in sources],
+        "type": [s.type for s in sources],
+        "title": [s.title for s in sources],
+        "year": [s.year for s in sources],
+        "journal": [s.journal for s in sources],
+        "book_title": [s.book_title for s in sources],
+        "publisher": [s.publisher for s in sources],
+        "city": [s.city for s in sources],
+        "volume": [s.volume for s in sources],
+        "issue": [s.issue for s in sources],
+        "pages": [s.pages for s in sources],
+        "doi": [s.doi for s in sources],
+        "url": [s.url for s in sources],
+        "authors": ["; ".join([a.format_ris() for a in s.authors]) for s in sources],
+    }
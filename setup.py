@@ -0,0 +1,23 @@
+"""Optional native build of converters.py with mypyc.
+
+    pip install mypy
+    python setup.py build_ext --inplace
+
+The compiled extension is picked up instead of converters.py when present;
+without it (or without mypyc) the app runs on the pure-Python module.
+"""
+from setuptools import setup
+
+try:
+    from mypyc.build import mypycify
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = mypycify(["converters.py"])
+
+setup(
+    name="convertidor-xml-ris-bib",
+    py_modules=["converters"],
+    python_requires=">=3.10",  # dataclass(slots=True)
+    ext_modules=ext_modules,
+)
@@ -2,7 +2,31 @@
 import io
 import pandas as pd
 import streamlit as st
-from converters import parse_sources_xml, to_bibtex, to_ris, to_rows
+from converters import parse_sources_xml, to_bibtex_bytes, to_ris_bytes, to_columns
+
+# Rows shown in the table; large files are previewed, not rendered in full
+PREVIEW_ROWS = 200
+
+# Streamlit reruns the script on every widget change; keep parse/export
+# results per uploaded file so toggling options does not redo the work.
+# The caches are shared by all sessions, so keep them bounded.
+CACHE_ENTRIES = 16
+CACHE_TTL = 3600  # seconds
+
+# cache_resource hands out the same list instead of unpickling a copy on
+# every call; the sources are only read, never modified, after parsing.
+@st.cache_resource(show_spinner=False, max_entries=CACHE_ENTRIES, ttl=CACHE_TTL)
+def _parse(xml_bytes: bytes):
+    return parse_sources_xml(xml_bytes)
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_ENTRIES, ttl=CACHE_TTL)
+def _table(xml_bytes: bytes) -> pd.DataFrame:
+    return pd.DataFrame(to_columns(_parse(xml_bytes)[:PREVIEW_ROWS]))
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_ENTRIES, ttl=CACHE_TTL)
+def _export(xml_bytes: bytes, file_ext: str) -> bytes:
+    sources = _parse(xml_bytes)
+    return to_bibtex_bytes(sources) if file_ext == "bib" else to_ris_bytes(sources)
 
 st.set_page_config(page_title="Word Sources.xml → BibTeX / RIS", page_icon="📚", layout="wide")
 st.title("📚 Convertidor: Microsoft Word Sources.xml → BibTeX (.bib) / RIS (.ris)")
@@ -18,7 +42,7 @@ uploaded = st.file_uploader("Arrastrá aquí tu `Sources.xml` o hacé clic para
 if uploaded is not None:
     xml_bytes = uploaded.read()
     try:
-        sources = parse_sources_xml(xml_bytes)
+        sources = _parse(xml_bytes)
     except Exception as e:
         st.error(f"No pude leer el XML. ¿Es un archivo `Sources.xml` de Word? Detalle: {e}")
         st.stop()
@@ -27,29 +51,36 @@ if uploaded is not None:
     if len(sources) == 0:
         st.info("No se encontraron referencias. Verificá que el archivo sea el `Sources.xml` exportado por Word (Administrar fuentes).")
     else:
-        rows = to_rows(sources)
-        df = pd.DataFrame(rows)
+        df = _table(xml_bytes)
         st.dataframe(df, use_container_width=True, hide_index=True)
+        if len(sources) > PREVIEW_ROWS:
+            st.caption(f"Mostrando las primeras {PREVIEW_ROWS} de {len(sources)} referencias.")
 
         if out_fmt.startswith("BibTeX"):
-            text = to_bibtex(sources)
             file_ext = "bib"
         else:
-            text = to_ris(sources)
             file_ext = "ris"
 
+        # Only serialize when the output is actually needed: for the preview,
+        # or once the user asked to prepare the download for this file/format.
+        export_id = (uploaded.file_id, file_ext)
         col1, col2 = st.columns([2,1])
+        with col2:
+            if not show_preview and st.session_state.get("export_ready") != export_id:
+                if st.button(f"Preparar {file_ext.upper()}"):
+                    st.session_state["export_ready"] = export_id
+            if show_preview or st.session_state.get("export_ready") == export_id:
+                data = _export(xml_bytes, file_ext)
+                st.download_button(
+                    label=f"⬇️ Descargar {file_ext.upper()}",
+                    data=data,
+                    file_name=f"sources_converted.{file_ext}",
+                    mime="text/plain",
+                )
         with col1:
             if show_preview:
                 st.subheader("Vista previa")
-                st.code(text[:20000], language="text")
-        with col2:
-            st.download_button(
-                label=f"⬇️ Descargar {file_ext.upper()}",
-                data=text.encode("utf-8"),
-                file_name=f"sources_converted.{file_ext}",
-                mime="text/plain",
-            )
+                st.code(data[:20000].decode("utf-8", "ignore"), language="text")
 
 st.markdown("---")
 st.markdown("Hecho para investigadores: convierte tus fuentes de Word al instante.")